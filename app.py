@@ -1,20 +1,25 @@
 # C:\Users\LENOVO\OneDrive\Desktop\pixelforge_nexus\app.py
 
-from flask import Flask, render_template, redirect, url_for, flash, request, send_from_directory, abort
+from flask import Flask, render_template, redirect, url_for, flash, request, send_from_directory, send_file, abort
 import os
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from sqlalchemy.orm import joinedload
 
 # --- 1. Import extensions (db, migrate, login_manager) from extensions.py ---
 # This breaks the circular import dependency
-from extensions import db, migrate, login_manager
+from extensions import db, migrate, login_manager, preview_service
+import previews
 
 # --- 2. Import Flask-Login components needed directly in app.py's routes ---
 # Ensure ALL necessary components are imported here, including login_required, current_user, etc.
 from flask_login import login_required, current_user, login_user, logout_user
 
 # --- 3. Import Models (now safe to import after extensions are defined) ---
-from models import User, Project, Document, project_assignments
+from models import User, Project, Document, project_assignments, ArchivedProject, ArchivedDocument, archived_assignments
+
+from archive import archive_cli, restore_project, ArchiveError
+from deadlines import deadlines_cli
 
 # --- 4. Import Forms (Forms often depend on Models, so import after them) ---
 from forms import LoginForm, RegistrationForm, AddProjectForm, AssignTeamForm, UploadDocumentForm, UpdatePasswordForm, UserManagementForm
@@ -22,7 +27,7 @@ from forms import LoginForm, RegistrationForm, AddProjectForm, AssignTeamForm, U
 
 # Initialize Flask app
 app = Flask(__name__)
-app.config.from_object('config.Config')
+app.config.from_object(os.environ.get('PIXELFORGE_CONFIG', 'config.Config'))
 
 # Ensure upload folder exists
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
@@ -34,6 +39,9 @@ db.init_app(app)
 migrate.init_app(app, db)
 login_manager.init_app(app)
 login_manager.login_view = 'login' # Redirect to login page if user is not logged in
+preview_service.init_app(app)
+app.cli.add_command(archive_cli) # flask archive run / restore
+app.cli.add_command(deadlines_cli) # flask deadlines digest
 
 
 @login_manager.user_loader
@@ -65,12 +73,14 @@ def inject_user_roles():
 @app.route('/index')
 @login_required # This decorator requires 'login_required' to be imported
 def index():
+    # Eager-load the lead so the template does not issue one query per project
+    query = Project.query.options(joinedload(Project.lead))
     if current_user.is_admin():
-        projects = Project.query.all()
+        projects = query.all()
     elif current_user.is_project_lead():
-        projects = Project.query.filter_by(lead_id=current_user.id).all()
+        projects = query.filter_by(lead_id=current_user.id).all()
     else: # Developer
-        projects = current_user.assigned_projects.all()
+        projects = query.join(project_assignments).filter(project_assignments.c.user_id == current_user.id).all()
     return render_template('index.html', title='Dashboard', projects=projects)
 
 
@@ -179,16 +189,26 @@ def project_details(project_id):
     Displays details of a specific project.
     Access controlled: Only assigned users, project leads, or admins can view.
     """
-    project = Project.query.get_or_404(project_id)
+    project = Project.query.options(joinedload(Project.lead)).filter_by(id=project_id).first_or_404()
+    developers = project.assigned_developers.all()
 
     # Access control logic
     if not current_user.is_admin() and \
        not (current_user.is_project_lead() and current_user.id == project.lead_id) and \
-       not (current_user.is_developer() and current_user in project.assigned_developers.all()):
+       not (current_user.is_developer() and current_user in developers):
         flash('You do not have permission to view this project.', 'danger')
         return redirect(url_for('index'))
 
-    return render_template('project_details.html', title=project.name, project=project)
+    # Eager-load uploaders so listing documents costs a single query
+    documents = project.documents.options(joinedload(Document.uploader)).all()
+    # Previews not cached yet are marked so the page script polls only those
+    preview_size = preview_service.sizes[0]
+    pending_previews = {document.id for document in documents
+                        if preview_service.kind_for(document.filepath)
+                        and not preview_service.is_ready(document.filepath, preview_size)}
+    return render_template('project_details.html', title=project.name, project=project,
+                           developers=developers, documents=documents,
+                           preview_size=preview_size, pending_previews=pending_previews)
 
 @app.route('/project/<int:project_id>/mark_completed')
 @login_required
@@ -202,6 +222,7 @@ def mark_project_completed(project_id):
 
     project = Project.query.get_or_404(project_id)
     project.is_completed = True
+    project.completed_at = datetime.utcnow()
     db.session.commit()
     flash(f'Project "{project.name}" marked as completed!', 'success')
     return redirect(url_for('index'))
@@ -295,6 +316,111 @@ def uploaded_file(filename):
 
     return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
 
+@app.route('/document/<int:document_id>/preview')
+@login_required
+def document_preview(document_id):
+    """
+    Serves a small preview (thumbnail or text snippet) of a document.
+    Previews are generated in the background on first request; until then a
+    placeholder is returned with status 202 so the client can retry.
+    Access controlled: Only assigned users, project leads, or admins can view.
+    """
+    document = Document.query.get_or_404(document_id)
+    project = document.project
+
+    # Access control logic
+    if not current_user.is_admin() and \
+       not (current_user.is_project_lead() and current_user.id == project.lead_id) and \
+       not (current_user.is_developer() and current_user in project.assigned_developers.all()):
+        abort(403)
+
+    size = request.args.get('size', preview_service.sizes[0], type=int)
+    if size not in preview_service.sizes:
+        abort(400)
+
+    status, path = preview_service.lookup(document.filepath, size)
+    if status == previews.READY:
+        try:
+            response = send_file(path, max_age=3600)
+        except FileNotFoundError:
+            # Evicted by another worker since the lookup; queue it again and serve the placeholder
+            preview_service.lookup(document.filepath, size)
+            status = previews.PENDING
+        else:
+            response.headers['Cache-Control'] = 'private, max-age=3600'
+            return response
+    if status == previews.PENDING:
+        return previews.pending_svg(size), 202, {
+            'Content-Type': 'image/svg+xml',
+            'Cache-Control': 'no-store',
+            'Retry-After': '1',
+        }
+    extension = document.filename.rsplit('.', 1)[-1] if '.' in document.filename else ''
+    return previews.file_icon_svg(size, extension), 200, {
+        'Content-Type': 'image/svg+xml',
+        'Cache-Control': 'private, max-age=3600',
+    }
+
+@app.route('/archive')
+@login_required
+def archive():
+    """
+    Read-only list of archived (completed and moved to cold storage) projects.
+    Admins see all of them, Project Leads those they led, Developers those they were assigned to.
+    """
+    query = ArchivedProject.query
+    if current_user.is_project_lead():
+        query = query.filter_by(lead_id=current_user.id)
+    elif not current_user.is_admin():
+        query = query.join(archived_assignments).filter(archived_assignments.c.user_id == current_user.id)
+    page = request.args.get('page', 1, type=int)
+    pagination = query.order_by(ArchivedProject.archived_at.desc(), ArchivedProject.id.desc()) \
+        .paginate(page=page, per_page=50, error_out=False)
+    return render_template('archive.html', title='Archive', pagination=pagination)
+
+@app.route('/archive/<int:archived_project_id>')
+@login_required
+def archived_project_details(archived_project_id):
+    """
+    Read-only details of an archived project: team and document metadata.
+    Access controlled like project_details.
+    """
+    archived_project = ArchivedProject.query.get_or_404(archived_project_id)
+    team = db.session.execute(
+        db.select(archived_assignments.c.user_id, archived_assignments.c.username)
+        .where(archived_assignments.c.archived_project_id == archived_project.id)
+        .order_by(archived_assignments.c.username)).all()
+
+    # Access control logic
+    if not current_user.is_admin() and \
+       not (current_user.is_project_lead() and current_user.id == archived_project.lead_id) and \
+       not (current_user.is_developer() and current_user.id in [member.user_id for member in team]):
+        flash('You do not have permission to view this project.', 'danger')
+        return redirect(url_for('archive'))
+
+    documents = archived_project.documents.all()
+    return render_template('archived_project_details.html', title=archived_project.name,
+                           archived_project=archived_project, team=team, documents=documents)
+
+@app.route('/archive/<int:archived_project_id>/restore', methods=['POST'])
+@login_required
+def restore_archived_project(archived_project_id):
+    """
+    Admin-only route to move an archived project (and its documents) back into the live tables.
+    """
+    if not current_user.is_admin():
+        flash('You do not have permission to restore projects.', 'danger')
+        return redirect(url_for('archive'))
+
+    archived_project = ArchivedProject.query.get_or_404(archived_project_id)
+    try:
+        project = restore_project(archived_project, fallback_uploader_id=current_user.id)
+    except ArchiveError as e:
+        flash(f'Could not restore project "{archived_project.name}": {e}', 'danger')
+        return redirect(url_for('archived_project_details', archived_project_id=archived_project_id))
+    flash(f'Project "{project.name}" restored from the archive.', 'success')
+    return redirect(url_for('project_details', project_id=project.id))
+
 @app.route('/users')
 @login_required
 def users():
@@ -349,9 +475,15 @@ def delete_user(user_id):
         project.lead_id = None # Set lead to None, or reassign if complex logic is needed
 
     # Remove user from assigned projects (many-to-many relationship)
-    for project in user.assigned_projects.all():
+    for project in list(user.assigned_projects):
         project.assigned_developers.remove(user)
 
+    # The archive stores bare user ids; drop them so a new user who is given this
+    # (reused) id cannot see or be restored into these projects. Usernames stay for display.
+    ArchivedProject.query.filter_by(lead_id=user.id).update({'lead_id': None}, synchronize_session=False)
+    ArchivedDocument.query.filter_by(uploaded_by_id=user.id).update({'uploaded_by_id': None}, synchronize_session=False)
+    db.session.execute(archived_assignments.delete().where(archived_assignments.c.user_id == user.id))
+
     # Delete documents uploaded by this user (and their physical files)
     for document in user.uploaded_documents.all():
         try:
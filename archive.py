@@ -0,0 +1,300 @@
+# C:\Users\LENOVO\OneDrive\Desktop\pixelforge_nexus\archive.py
+
+import gzip
+import os
+import shutil
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import (User, Project, Document, project_assignments,
+                    ArchivedProject, ArchivedDocument, archived_assignments)
+
+
+class ArchiveError(Exception):
+    """Raised when an archived project cannot be restored; nothing has been changed."""
+
+
+def archive_completed_projects(older_than_days=None, move_blobs=False):
+    """
+    Moves completed projects older than `older_than_days` (default ARCHIVE_AFTER_DAYS),
+    with their assignments and document metadata, into the archive tables.
+    Age is measured from completed_at, or from the deadline for projects completed
+    before that column existed. With `move_blobs`, document files are gzipped into
+    ARCHIVE_FOLDER and removed from the upload folder.
+    Works in batches of ARCHIVE_BATCH_SIZE projects, one transaction each.
+    Returns the number of projects archived.
+    """
+    if older_than_days is None:
+        older_than_days = current_app.config['ARCHIVE_AFTER_DAYS']
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    batch_size = current_app.config['ARCHIVE_BATCH_SIZE']
+
+    archived = 0
+    while True:
+        projects = Project.query.options(joinedload(Project.lead)).filter(
+            Project.is_completed == True,
+            func.coalesce(Project.completed_at, Project.deadline) < cutoff
+        ).order_by(Project.id).limit(batch_size).all()
+        if not projects:
+            break
+        _archive_batch(projects, move_blobs)
+        archived += len(projects)
+    return archived
+
+
+def _archive_batch(projects, move_blobs):
+    project_ids = [project.id for project in projects]
+
+    documents_by_project = defaultdict(list)
+    for document in Document.query.options(joinedload(Document.uploader)) \
+            .filter(Document.project_id.in_(project_ids)).all():
+        documents_by_project[document.project_id].append(document)
+
+    assignments_by_project = defaultdict(list)
+    for project_id, user_id, username in db.session.execute(
+            select(project_assignments.c.project_id, User.id, User.username)
+            .join(User, User.id == project_assignments.c.user_id)
+            .where(project_assignments.c.project_id.in_(project_ids))):
+        assignments_by_project[project_id].append({'user_id': user_id, 'username': username})
+
+    rows = {}
+    for project in projects:
+        rows[project.id] = ArchivedProject(
+            original_id=project.id,
+            name=project.name,
+            description=project.description,
+            deadline=project.deadline,
+            completed_at=project.completed_at,
+            lead_id=project.lead_id,
+            lead_username=project.lead.username if project.lead else None
+        )
+
+    # Compress blobs before touching the database: SQLite holds its write lock from the
+    # first flush until commit, and gzipping a batch of large files would block web requests.
+    # Folders are named from the live ids plus a timestamp, as archive row ids don't exist yet.
+    archive_paths = {}
+    written_files = []
+    stamp = datetime.utcnow().strftime('%Y%m%d%H%M%S%f')
+    try:
+        if move_blobs:
+            for project_id, documents in documents_by_project.items():
+                for document in documents:
+                    if os.path.exists(document.filepath):
+                        archive_path = os.path.join(current_app.config['ARCHIVE_FOLDER'], f'{project_id}_{stamp}',
+                                                    f'{document.id}_{document.filename}.gz')
+                        _compress(document.filepath, archive_path)
+                        written_files.append(archive_path)
+                        archive_paths[document.id] = archive_path
+    except Exception:
+        for path in written_files:
+            _remove_file(path)
+        raise
+
+    moved_blobs = {document.filepath for documents in documents_by_project.values()
+                   for document in documents if document.id in archive_paths}
+
+    try:
+        db.session.add_all(rows.values())
+        db.session.flush() # Assigns archived_project ids
+        for project_id, documents in documents_by_project.items():
+            row = rows[project_id]
+            for document in documents:
+                db.session.add(ArchivedDocument(
+                    original_id=document.id,
+                    filename=document.filename,
+                    filepath=document.filepath,
+                    archive_path=archive_paths.get(document.id),
+                    upload_date=document.upload_date,
+                    uploaded_by_id=document.uploaded_by_id,
+                    uploader_username=document.uploader.username if document.uploader else None,
+                    archived_project_id=row.id
+                ))
+
+        assignment_rows = [dict(assignment, archived_project_id=rows[project_id].id)
+                           for project_id, assignments in assignments_by_project.items()
+                           for assignment in assignments]
+        if assignment_rows:
+            db.session.execute(archived_assignments.insert(), assignment_rows)
+
+        db.session.execute(project_assignments.delete().where(project_assignments.c.project_id.in_(project_ids)))
+        Document.query.filter(Document.project_id.in_(project_ids)).delete(synchronize_session=False)
+        Project.query.filter(Project.id.in_(project_ids)).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        for path in written_files:
+            _remove_file(path)
+        raise
+
+    if moved_blobs:
+        # Only delete originals that no live document still points at (same filename re-uploaded elsewhere)
+        still_used = set(db.session.scalars(select(Document.filepath).where(Document.filepath.in_(moved_blobs))))
+        for path in moved_blobs - still_used:
+            _remove_file(path)
+
+
+def restore_project(archived_project, fallback_uploader_id=None):
+    """
+    Moves an archived project back into the live tables. It stays marked completed,
+    but its completion time is reset to now so the next archive run does not move it
+    straight back; it is archived again once it ages past the threshold.
+    The original project and document ids are reused when they are free.
+    Assignments to users deleted since archival are dropped, and documents whose
+    uploader no longer exists are attributed to `fallback_uploader_id`
+    (default: the first admin). Returns the restored Project.
+    """
+    archived_id = archived_project.id
+    archived_documents = archived_project.documents.all()
+    archive_paths = [d.archive_path for d in archived_documents if d.archive_path]
+    assignments = db.session.execute(
+        select(archived_assignments.c.user_id)
+        .where(archived_assignments.c.archived_project_id == archived_id)).scalars().all()
+
+    referenced_ids = set(assignments) | {d.uploaded_by_id for d in archived_documents}
+    if archived_project.lead_id is not None:
+        referenced_ids.add(archived_project.lead_id)
+    existing_users = set(db.session.scalars(select(User.id).where(User.id.in_(referenced_ids))))
+    if fallback_uploader_id is None:
+        fallback_uploader_id = db.session.scalars(select(User.id).filter_by(role='admin').order_by(User.id)).first()
+
+    # Check everything that could fail before writing any file or row
+    missing = [d.filename for d in archived_documents if d.archive_path and not os.path.isfile(d.archive_path)]
+    if missing:
+        raise ArchiveError(f'Archived file(s) missing from the cold store: {", ".join(missing)}.')
+    if fallback_uploader_id is None and any(d.uploaded_by_id not in existing_users for d in archived_documents):
+        raise ArchiveError('Some documents were uploaded by deleted users and there is no admin to attribute them to.')
+
+    project_id = archived_project.original_id
+    if db.session.get(Project, project_id) is not None:
+        project_id = None # Id was reused by a newer project; let the database pick one
+    project = Project(
+        id=project_id,
+        name=archived_project.name,
+        description=archived_project.description,
+        deadline=archived_project.deadline,
+        is_completed=True,
+        completed_at=datetime.utcnow(),
+        lead_id=archived_project.lead_id if archived_project.lead_id in existing_users else None
+    )
+    taken_document_ids = set(db.session.scalars(
+        select(Document.id).where(Document.id.in_([d.original_id for d in archived_documents]))))
+
+    # Decompress before touching the database, for the same reason as in _archive_batch
+    restored_paths = {}
+    written_files = []
+    try:
+        for archived_document in archived_documents:
+            if archived_document.archive_path:
+                filename, filepath = _free_upload_path(archived_document.filename)
+                written_files.append(filepath)
+                _decompress(archived_document.archive_path, filepath)
+                restored_paths[archived_document.id] = (filename, filepath)
+    except (OSError, EOFError) as e: # EOFError: truncated gzip file
+        for path in written_files:
+            _remove_file(path)
+        raise ArchiveError(f'Could not read archived file "{archived_document.filename}": {e}') from e
+    except Exception:
+        for path in written_files:
+            _remove_file(path)
+        raise
+
+    try:
+        db.session.add(project)
+        db.session.flush() # Assigns the project id when the original one was taken
+        for archived_document in archived_documents:
+            filename, filepath = restored_paths.get(archived_document.id,
+                                                    (archived_document.filename, archived_document.filepath))
+            db.session.add(Document(
+                id=None if archived_document.original_id in taken_document_ids else archived_document.original_id,
+                filename=filename,
+                filepath=filepath,
+                upload_date=archived_document.upload_date,
+                project_id=project.id,
+                uploaded_by_id=archived_document.uploaded_by_id
+                if archived_document.uploaded_by_id in existing_users else fallback_uploader_id
+            ))
+
+        assignment_rows = [{'project_id': project.id, 'user_id': user_id}
+                           for user_id in assignments if user_id in existing_users]
+        if assignment_rows:
+            db.session.execute(project_assignments.insert(), assignment_rows)
+
+        db.session.execute(archived_assignments.delete()
+                           .where(archived_assignments.c.archived_project_id == archived_id))
+        ArchivedDocument.query.filter_by(archived_project_id=archived_id).delete(synchronize_session=False)
+        db.session.delete(archived_project)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        for path in written_files:
+            _remove_file(path)
+        raise
+
+    for path in archive_paths:
+        _remove_file(path)
+    for folder in {os.path.dirname(path) for path in archive_paths}:
+        try:
+            os.rmdir(folder) # Only succeeds once the folder is empty
+        except OSError:
+            pass
+    return project
+
+
+def _compress(source, destination):
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    with open(source, 'rb') as src, gzip.open(destination, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def _decompress(source, destination):
+    with gzip.open(source, 'rb') as src, open(destination, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def _free_upload_path(filename):
+    """Returns (filename, filepath) in UPLOAD_FOLDER that does not overwrite an existing file."""
+    folder = current_app.config['UPLOAD_FOLDER']
+    stem, extension = os.path.splitext(filename)
+    candidate, counter = filename, 1
+    while os.path.exists(os.path.join(folder, candidate)):
+        candidate = f'{stem}_restored{counter}{extension}'
+        counter += 1
+    return candidate, os.path.join(folder, candidate)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        print(f"Error deleting file {path}: {e}") # Log error but don't stop
+
+
+# --- CLI: flask archive run / flask archive restore <id> ---
+archive_cli = AppGroup('archive', help='Move completed projects into the archive tables and back.')
+
+@archive_cli.command('run')
+@click.option('--older-than', type=int, default=None,
+              help='Archive projects completed more than this many days ago (default: ARCHIVE_AFTER_DAYS).')
+@click.option('--move-blobs', is_flag=True, help='Also gzip document files into ARCHIVE_FOLDER.')
+def archive_run_command(older_than, move_blobs):
+    count = archive_completed_projects(older_than, move_blobs)
+    click.echo(f'Archived {count} project(s).')
+
+@archive_cli.command('restore')
+@click.argument('archived_project_id', type=int)
+def archive_restore_command(archived_project_id):
+    archived_project = db.session.get(ArchivedProject, archived_project_id)
+    if archived_project is None:
+        raise click.ClickException(f'No archived project with id {archived_project_id}.')
+    try:
+        project = restore_project(archived_project)
+    except ArchiveError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Restored "{project.name}" as project {project.id}.')
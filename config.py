@@ -1,10 +1,41 @@
 # C:\Users\LENOVO\OneDrive\Desktop\pixelforge_nexus\config.py
 
 import os
+import tempfile
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your_super_secret_key_here_replace_in_prod'
     SQLALCHEMY_DATABASE_URI = 'sqlite:///site.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     UPLOAD_FOLDER = 'instance/uploads' # Where documents will be stored
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max file upload size
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max file upload size
+
+    # Document previews (see previews.py)
+    PREVIEW_FOLDER = 'instance/previews' # On-disk preview cache
+    PREVIEW_CACHE_BYTES = 64 * 1024 * 1024 # LRU budget for the preview cache
+    PREVIEW_SIZES = (128, 512) # Allowed preview edge lengths in pixels
+    PREVIEW_WORKERS = 2 # Background threads generating previews
+    PREVIEW_RETRY_AFTER = 60 # Seconds before a failed preview is attempted again
+    PREVIEW_DIGEST_CACHE_SIZE = 10000 # Content hashes kept in memory (the rest are read from the on-disk index)
+
+    # Archival of completed projects (see archive.py)
+    ARCHIVE_FOLDER = 'instance/archive' # Cold store for compressed documents of archived projects
+    ARCHIVE_AFTER_DAYS = 90 # Completed projects older than this are archived
+    ARCHIVE_BATCH_SIZE = 500 # Projects moved per transaction
+
+    # Deadline digests (see deadlines.py)
+    DEADLINE_DIGEST_WINDOWS = (1, 7, 30) # Days ahead; each project is listed under the smallest window it falls in
+    DEADLINE_DIGEST_OUTBOX = 'instance/outbox' # Digests are written here as mbox files instead of being sent
+    DEADLINE_DIGEST_BATCH_SIZE = 500 # Digests per outbox file
+    DEADLINE_DIGEST_SENDER = 'noreply@pixelforge.com'
+
+
+class TestConfig(Config):
+    # Selected with PIXELFORGE_CONFIG=config.TestConfig (see tests/conftest.py)
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite://' # In-memory database, rebuilt for every test
+    UPLOAD_FOLDER = os.path.join(tempfile.gettempdir(), 'pixelforge_test', 'uploads')
+    PREVIEW_FOLDER = os.path.join(tempfile.gettempdir(), 'pixelforge_test', 'previews')
+    ARCHIVE_FOLDER = os.path.join(tempfile.gettempdir(), 'pixelforge_test', 'archive')
+    DEADLINE_DIGEST_OUTBOX = os.path.join(tempfile.gettempdir(), 'pixelforge_test', 'outbox')
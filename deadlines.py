@@ -0,0 +1,154 @@
+# C:\Users\LENOVO\OneDrive\Desktop\pixelforge_nexus\deadlines.py
+
+import os
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from extensions import db
+from models import User, Project, project_assignments
+
+FETCH_BATCH_ROWS = 10000 # Rows streamed from the database at a time
+
+
+class Digest:
+    """Upcoming deadlines for one recipient (a project lead or an assigned developer)."""
+
+    def __init__(self, user_id, username, email):
+        self.user_id = user_id
+        self.username = username
+        self.email = email
+        self.items = [] # (window_days, role, project_name, deadline), in deadline order
+
+    def add(self, window_days, role, project_name, deadline):
+        self.items.append((window_days, role, project_name, deadline))
+
+    def to_mbox_entry(self, sender, timestamp):
+        """
+        Renders the digest as one mbox entry. Built as plain text because the email
+        package's header parsing costs more than the whole database query at this volume.
+        """
+        lines = [
+            f'From {sender} {timestamp}',
+            f'From: {sender}',
+            f'To: {self.email}',
+            f'Subject: PixelForge Nexus: {len(self.items)} project deadline(s) coming up',
+            'MIME-Version: 1.0',
+            'Content-Type: text/plain; charset="utf-8"',
+            'Content-Transfer-Encoding: 8bit',
+            '',
+            f'Hello {self.username},',
+            '',
+        ]
+        current_window = None
+        for window_days, role, project_name, deadline in sorted(self.items, key=lambda item: (item[0], item[3])):
+            if window_days != current_window:
+                current_window = window_days
+                lines.append(f'Due within {window_days} day(s):')
+            lines.append(f"  - {project_name} ({deadline.strftime('%Y-%m-%d')}){' [you lead this project]' if role == 'lead' else ''}")
+        body = '\n'.join(lines[1:]).replace('\nFrom ', '\n>From ') # mbox escaping
+        return f'{lines[0]}\n{body}\n\n'
+
+
+def collect_digests(windows=None, now=None):
+    """
+    Finds active projects due within the largest of `windows` (days ahead, default
+    DEADLINE_DIGEST_WINDOWS) and groups them per lead and per assigned developer.
+    Uses a single query: a range scan on the indexed deadline column joined with
+    leads and assignments, read in one streamed pass.
+    Returns (number of projects, {user_id: Digest}).
+    """
+    windows = sorted(windows or current_app.config['DEADLINE_DIGEST_WINDOWS'])
+    now = now or datetime.utcnow()
+    boundaries = [now + timedelta(days=days) for days in windows]
+
+    lead = aliased(User)
+    developer = aliased(User)
+    query = select(
+        Project.id, Project.name, Project.deadline,
+        lead.id, lead.username, lead.email,
+        developer.id, developer.username, developer.email
+    ).outerjoin(lead, lead.id == Project.lead_id) \
+     .outerjoin(project_assignments, project_assignments.c.project_id == Project.id) \
+     .outerjoin(developer, developer.id == project_assignments.c.user_id) \
+     .where(Project.deadline >= now, Project.deadline < boundaries[-1], Project.is_completed.is_not(True)) \
+     .order_by(Project.deadline, Project.id) \
+     .execution_options(yield_per=FETCH_BATCH_ROWS)
+
+    digests = {}
+    project_count = 0
+    last_project_id = None
+    window_days = None
+    for (project_id, name, deadline, lead_id, lead_username, lead_email,
+         developer_id, developer_username, developer_email) in db.session.execute(query):
+        # Rows of one project are adjacent (one per assigned developer); the lead is added once
+        if project_id != last_project_id:
+            last_project_id = project_id
+            project_count += 1
+            window_days = windows[bisect_right(boundaries, deadline)]
+            if lead_id is not None:
+                digest = digests.get(lead_id)
+                if digest is None:
+                    digest = digests[lead_id] = Digest(lead_id, lead_username, lead_email)
+                digest.add(window_days, 'lead', name, deadline)
+        # A lead who is also assigned to their own project already has it listed as 'lead'
+        if developer_id is not None and developer_id != lead_id:
+            digest = digests.get(developer_id)
+            if digest is None:
+                digest = digests[developer_id] = Digest(developer_id, developer_username, developer_email)
+            digest.add(window_days, 'developer', name, deadline)
+    return project_count, digests
+
+
+def write_outbox(digests, outbox=None, batch_size=None, now=None):
+    """
+    Writes the digests as email messages into mbox files in `outbox` (default
+    DEADLINE_DIGEST_OUTBOX), `batch_size` messages per file, standing in for an
+    SMTP server. Returns the paths of the files written.
+    """
+    outbox = outbox or current_app.config['DEADLINE_DIGEST_OUTBOX']
+    batch_size = batch_size or current_app.config['DEADLINE_DIGEST_BATCH_SIZE']
+    sender = current_app.config['DEADLINE_DIGEST_SENDER']
+    now = now or datetime.utcnow()
+    stamp = now.strftime('%Y%m%dT%H%M%S')
+    timestamp = now.strftime('%a %b %d %H:%M:%S %Y') # mbox "From " line format
+    os.makedirs(outbox, exist_ok=True)
+
+    digests = list(digests)
+    paths = []
+    for start in range(0, len(digests), batch_size):
+        path = os.path.join(outbox, f'deadlines-{stamp}-{start // batch_size + 1:04d}.mbox')
+        # Write to a temporary name first so a mail relay picking up the outbox never sees a partial file
+        with open(f'{path}.tmp', 'w', encoding='utf-8', newline='\n') as f:
+            f.writelines(digest.to_mbox_entry(sender, timestamp) for digest in digests[start:start + batch_size])
+        os.replace(f'{path}.tmp', path)
+        paths.append(path)
+    return paths
+
+
+# --- CLI: flask deadlines digest ---
+deadlines_cli = AppGroup('deadlines', help='Project deadline notifications.')
+
+@deadlines_cli.command('digest')
+@click.option('--window', 'windows', type=int, multiple=True,
+              help='Days ahead to report on; repeat for several windows (default: DEADLINE_DIGEST_WINDOWS).')
+@click.option('--outbox', default=None, help='Directory to write digests to (default: DEADLINE_DIGEST_OUTBOX).')
+@click.option('--every', type=int, default=None,
+              help='Keep running as a worker, writing digests every this many minutes.')
+def deadlines_digest_command(windows, outbox, every):
+    while True:
+        started = time.perf_counter()
+        project_count, digests = collect_digests(windows)
+        paths = write_outbox(digests.values(), outbox)
+        db.session.remove() # Don't hold a connection or stale rows between runs
+        click.echo(f'{project_count} project(s) due, {len(digests)} digest(s) written to '
+                   f'{len(paths)} file(s) in {time.perf_counter() - started:.2f}s.')
+        if every is None:
+            break
+        time.sleep(every * 60)
@@ -3,7 +3,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from previews import PreviewService
 
 db = SQLAlchemy()
 migrate = Migrate()
-login_manager = LoginManager()
\ No newline at end of file
+login_manager = LoginManager()
+preview_service = PreviewService()
@@ -45,8 +45,9 @@ class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), nullable=False)
     description = db.Column(db.Text)
-    deadline = db.Column(db.DateTime, nullable=False)
+    deadline = db.Column(db.DateTime, nullable=False, index=True) # Range-scanned by the deadline digest
     is_completed = db.Column(db.Boolean, default=False)
+    completed_at = db.Column(db.DateTime) # Set by mark_project_completed; used to pick projects to archive
     lead_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     documents = db.relationship('Document', backref='project', lazy='dynamic')
 
@@ -62,4 +63,43 @@ class Document(db.Model):
     uploaded_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
     def __repr__(self):
-        return f'<Document {self.filename}>'
\ No newline at end of file
+        return f'<Document {self.filename}>'
+
+# --- Archive (cold store) ---
+# Completed projects are moved here by archive.py so the live tables only hold active work.
+# Rows keep the original ids and a snapshot of usernames, since users may be deleted later.
+
+archived_assignments = db.Table('archived_assignments',
+    db.Column('archived_project_id', db.Integer, db.ForeignKey('archived_project.id'), primary_key=True),
+    db.Column('user_id', db.Integer, primary_key=True),
+    db.Column('username', db.String(64), nullable=False)
+)
+
+class ArchivedProject(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    original_id = db.Column(db.Integer, nullable=False, index=True)
+    name = db.Column(db.String(128), nullable=False)
+    description = db.Column(db.Text)
+    deadline = db.Column(db.DateTime, nullable=False)
+    completed_at = db.Column(db.DateTime)
+    lead_id = db.Column(db.Integer)
+    lead_username = db.Column(db.String(64))
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    documents = db.relationship('ArchivedDocument', backref='project', lazy='dynamic')
+
+    def __repr__(self):
+        return f'<ArchivedProject {self.name}>'
+
+class ArchivedDocument(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    original_id = db.Column(db.Integer, nullable=False)
+    filename = db.Column(db.String(256), nullable=False)
+    filepath = db.Column(db.String(512), nullable=False) # Original path in the upload folder
+    archive_path = db.Column(db.String(512)) # Compressed copy in the cold folder, if the blob was moved
+    upload_date = db.Column(db.DateTime)
+    uploaded_by_id = db.Column(db.Integer)
+    uploader_username = db.Column(db.String(64))
+    archived_project_id = db.Column(db.Integer, db.ForeignKey('archived_project.id'), nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<ArchivedDocument {self.filename}>'
@@ -0,0 +1,319 @@
+# C:\Users\LENOVO\OneDrive\Desktop\pixelforge_nexus\previews.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+# Pillow and pypdf are optional: without them image thumbnails / PDF snippets
+# are simply reported as unsupported and the generic file icon is shown.
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pragma: no cover - depends on the environment
+    PdfReader = None
+
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp', 'tga', 'tif', 'tiff'}
+TEXT_EXTENSIONS = {'txt', 'md', 'csv', 'json', 'xml', 'yaml', 'yml', 'ini', 'cfg', 'log',
+                   'py', 'js', 'html', 'css', 'lua', 'glsl', 'hlsl', 'shader'}
+
+# Preview lookup results
+READY = 'ready'
+PENDING = 'pending'
+UNSUPPORTED = 'unsupported'
+
+PREVIEW_EXTENSIONS = ('png', 'jpg', 'svg')
+INDEX_FILENAME = 'digests.sqlite' # Persistent (filepath, mtime, size) -> content hash index
+
+SNIPPET_BYTES = 4096 # How much of a text document is read for its snippet
+SNIPPET_LINES = 12
+SNIPPET_LINE_CHARS = 60
+
+
+def _placeholder_svg(size, label):
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">'
+        f'<rect width="100%" height="100%" fill="#e0e0e0"/>'
+        f'<text x="50%" y="50%" font-family="Arial, sans-serif" font-size="{max(size // 10, 10)}" '
+        f'fill="#666" text-anchor="middle" dominant-baseline="middle">{escape(label)}</text>'
+        f'</svg>'
+    )
+
+
+def pending_svg(size):
+    """Shown while a preview is being generated in the background."""
+    return _placeholder_svg(size, 'Generating...')
+
+
+def file_icon_svg(size, extension):
+    """Shown for documents that have no preview (unknown type or generation failed)."""
+    return _placeholder_svg(size, (extension or 'file').upper())
+
+
+class PreviewService:
+    """
+    Lazily generates document previews off the request path.
+
+    Previews are cached on disk under PREVIEW_FOLDER, keyed by the SHA-256 of the
+    document contents and the requested size, so re-uploads of identical files share
+    a preview. The cache is bounded by PREVIEW_CACHE_BYTES and evicts the least
+    recently used previews (a cache hit refreshes the file's mtime).
+
+    The content hash of each document version is kept in a small SQLite index next
+    to the previews (one row per document path), fronted by an in-memory LRU, so a
+    restart does not require re-reading the originals to find their cached previews.
+    """
+
+    def __init__(self, app=None):
+        self.folder = None
+        self.max_bytes = 0
+        self.sizes = ()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._digests = OrderedDict() # LRU of (filepath, mtime_ns, st_size) -> content hash
+        self.max_digests = 0
+        self._index_path = None
+        self._pending = set()
+        self._failed = {} # job key -> time.monotonic() after which generation is retried
+        self.retry_after = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.folder = app.config['PREVIEW_FOLDER']
+        self.max_bytes = app.config['PREVIEW_CACHE_BYTES']
+        self.sizes = tuple(app.config['PREVIEW_SIZES'])
+        self.retry_after = app.config['PREVIEW_RETRY_AFTER']
+        self._executor = ThreadPoolExecutor(max_workers=app.config['PREVIEW_WORKERS'],
+                                            thread_name_prefix='preview')
+        self.max_digests = app.config['PREVIEW_DIGEST_CACHE_SIZE']
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        self._index_path = os.path.join(self.folder, INDEX_FILENAME)
+        with closing(self._connect_index()) as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS digests (filepath TEXT PRIMARY KEY, '
+                         'mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, digest TEXT NOT NULL)')
+            conn.commit()
+
+    @staticmethod
+    def kind_for(filename):
+        """Returns 'image', 'text', 'pdf' or None if the file type cannot be previewed."""
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        if extension in IMAGE_EXTENSIONS and Image is not None:
+            return 'image'
+        if extension in TEXT_EXTENSIONS:
+            return 'text'
+        if extension == 'pdf' and PdfReader is not None:
+            return 'pdf'
+        return None
+
+    def is_ready(self, filepath, size):
+        """True if the preview is already cached. Unlike lookup() this never queues generation."""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return False
+        digest = self._digest_for((filepath, stat.st_mtime_ns, stat.st_size))
+        return digest is not None and self._cached_path(digest, size) is not None
+
+    def lookup(self, filepath, size):
+        """
+        Returns (status, path). When the preview is not cached yet its generation is
+        queued and PENDING is returned; the caller should serve a placeholder.
+        """
+        kind = self.kind_for(filepath)
+        if kind is None:
+            return UNSUPPORTED, None
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return UNSUPPORTED, None
+        source_key = (filepath, stat.st_mtime_ns, stat.st_size)
+        job_key = source_key + (size,)
+
+        with self._lock:
+            retry_at = self._failed.get(job_key)
+            if retry_at is not None:
+                # Failures may be transient (file still being written, I/O error), so retry later
+                if time.monotonic() < retry_at:
+                    return UNSUPPORTED, None
+                del self._failed[job_key]
+
+        digest = self._digest_for(source_key)
+        if digest is not None:
+            cached = self._cached_path(digest, size)
+            if cached is not None:
+                self._touch(cached)
+                return READY, cached
+
+        with self._lock:
+            if job_key not in self._pending:
+                self._pending.add(job_key)
+                self._executor.submit(self._generate, kind, source_key, size)
+        return PENDING, None
+
+    def _connect_index(self):
+        return sqlite3.connect(self._index_path, timeout=5)
+
+    def _digest_for(self, source_key):
+        """Content hash of a document version from the in-memory LRU or the on-disk index, else None."""
+        with self._lock:
+            digest = self._digests.get(source_key)
+            if digest is not None:
+                self._digests.move_to_end(source_key)
+                return digest
+        try:
+            with closing(self._connect_index()) as conn:
+                row = conn.execute('SELECT digest FROM digests WHERE filepath = ? AND mtime_ns = ? AND size = ?',
+                                   source_key).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading preview index: {e}") # Treat as a miss; the file is hashed again
+            return None
+        if row is None:
+            return None
+        self._remember(source_key, row[0])
+        return row[0]
+
+    def _remember(self, source_key, digest):
+        with self._lock:
+            self._digests[source_key] = digest
+            self._digests.move_to_end(source_key)
+            while len(self._digests) > self.max_digests:
+                self._digests.popitem(last=False)
+
+    def _save_digest(self, source_key, digest):
+        self._remember(source_key, digest)
+        try:
+            with closing(self._connect_index()) as conn:
+                # Keyed by path, so an older version of the same document is replaced
+                conn.execute('INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)', source_key + (digest,))
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error writing preview index: {e}") # Only costs a re-hash after a restart
+
+    def _cached_path(self, digest, size):
+        for extension in PREVIEW_EXTENSIONS:
+            path = os.path.join(self.folder, f'{digest}_{size}.{extension}')
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _generate(self, kind, source_key, size):
+        filepath = source_key[0]
+        job_key = source_key + (size,)
+        try:
+            digest = self._digest_for(source_key) or _hash_file(filepath)
+            self._save_digest(source_key, digest)
+            if self._cached_path(digest, size) is None:
+                if kind == 'image':
+                    data, extension = _render_image(filepath, size)
+                elif kind == 'pdf':
+                    data, extension = _render_text(_pdf_first_page_text(filepath), size), 'svg'
+                else:
+                    data, extension = _render_text(_read_text_snippet(filepath), size), 'svg'
+                self._store(f'{digest}_{size}.{extension}', data)
+        except Exception as e:
+            print(f"Error generating preview for {filepath}: {e}") # Log error, fall back to the file icon
+            with self._lock:
+                now = time.monotonic()
+                self._failed = {key: retry_at for key, retry_at in self._failed.items() if retry_at > now}
+                self._failed[job_key] = now + self.retry_after
+        finally:
+            with self._lock:
+                self._pending.discard(job_key)
+
+    def _store(self, name, data):
+        # Write to a temporary name first so readers never see a partial preview
+        path = os.path.join(self.folder, name)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        """Deletes least recently used previews until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(PREVIEW_EXTENSIONS):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, entry_size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= entry_size
+            except OSError:
+                pass
+
+
+def _hash_file(filepath):
+    sha = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _render_image(filepath, size):
+    with Image.open(filepath) as img:
+        img.draft('RGB', (size, size)) # Lets JPEG decoding skip straight to a reduced scale
+        img.thumbnail((size, size))
+        buffer = BytesIO()
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img.save(buffer, format='PNG', optimize=True)
+            return buffer.getvalue(), 'png'
+        img.convert('RGB').save(buffer, format='JPEG', quality=80)
+        return buffer.getvalue(), 'jpg'
+
+
+def _read_text_snippet(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read(SNIPPET_BYTES).decode('utf-8', errors='replace')
+
+
+def _pdf_first_page_text(filepath):
+    reader = PdfReader(filepath)
+    if not reader.pages:
+        return ''
+    return reader.pages[0].extract_text() or ''
+
+
+def _render_text(text, size):
+    lines = [line[:SNIPPET_LINE_CHARS] for line in text.splitlines() if line.strip()][:SNIPPET_LINES]
+    font_size = max(size // (SNIPPET_LINES + 2), 6)
+    rows = ''.join(
+        f'<text x="4" y="{(i + 1) * font_size + 4}">{escape(line)}</text>'
+        for i, line in enumerate(lines)
+    )
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">'
+        f'<rect width="100%" height="100%" fill="#fff" stroke="#ccc"/>'
+        f'<g font-family="monospace" font-size="{font_size}" fill="#333">{rows}</g>'
+        f'</svg>'
+    )
+    return svg.encode('utf-8')
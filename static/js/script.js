@@ -131,6 +131,41 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    // 5. Document previews
+    // Previews are generated in the background; the server answers 202 with a
+    // placeholder until the real one is ready. Only images the server marked as
+    // pending are polled, and only once they scroll into view (the browser's own
+    // lazy load of the placeholder is what queues the generation).
+    const pendingPreviews = document.querySelectorAll('img.document-preview[data-pending]');
+    if (pendingPreviews.length && 'IntersectionObserver' in window) {
+        const pollPreview = (img, attempt) => {
+            fetch(img.dataset.previewUrl, { credentials: 'same-origin' }).then(response => {
+                if (response.status === 202) {
+                    if (attempt < 10) {
+                        setTimeout(() => pollPreview(img, attempt + 1), 1000 * (attempt + 1)); // Back off between retries
+                    }
+                } else if (response.ok) {
+                    // Reuse the downloaded body instead of requesting the image again
+                    return response.blob().then(blob => {
+                        img.src = URL.createObjectURL(blob);
+                    });
+                }
+            }).catch(() => {
+                // Network error: keep the placeholder
+            });
+        };
+
+        const previewObserver = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    previewObserver.unobserve(entry.target);
+                    setTimeout(() => pollPreview(entry.target, 0), 1000);
+                }
+            });
+        });
+        pendingPreviews.forEach(img => previewObserver.observe(img));
+    }
+
     // Add CSS for active-nav in style.css:
     /*
     nav ul li a.active-nav {
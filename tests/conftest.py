@@ -0,0 +1,114 @@
+# Shared fixtures: the app on an in-memory SQLite database, seeded at a chosen scale.
+
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+# Must be set before app.py is imported, since it configures the app at import time.
+# Always overridden: a value exported in the shell could point the fixtures at the real site.db.
+os.environ['PIXELFORGE_CONFIG'] = 'config.TestConfig'
+
+from app import app as flask_app
+from extensions import db
+from models import User, Project, Document
+
+# Hashing a real password for every seeded user would dominate test time
+SEED_PASSWORD_HASH = 'seeded-user-cannot-log-in-with-a-password'
+
+
+def pytest_addoption(parser):
+    parser.addoption('--seed-scales', default='1,10,50',
+                     help='Comma-separated data sizes used by tests that take the `scale` fixture.')
+
+
+def pytest_generate_tests(metafunc):
+    if 'scale' in metafunc.fixturenames:
+        scales = [int(s) for s in metafunc.config.getoption('seed_scales').split(',')]
+        metafunc.parametrize('scale', scales, ids=[f'scale{s}' for s in scales])
+
+
+@pytest.fixture
+def app():
+    # No app context is held open during the test: each test client request must
+    # get its own context (and so its own session and flask.g), as in production.
+    # The fixtures create and drop every table, so refuse to run against anything but the test database.
+    assert flask_app.config['TESTING'], 'tests must run with config.TestConfig'
+    assert flask_app.config['SQLALCHEMY_DATABASE_URI'] == 'sqlite://', 'tests must use the in-memory database'
+    with flask_app.app_context():
+        db.create_all()
+    yield flask_app
+    with flask_app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """Logs the test client in as the given user id (skips the password form)."""
+    def _login(user_id):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+    return _login
+
+
+@pytest.fixture
+def seed(app):
+    """
+    Factory that fills the database and returns the ids of what it created:
+
+        data = seed(projects=50, developers_per_project=5, documents_per_project=5)
+
+    Every project gets its own lead, except that `data.lead` leads every other
+    project; every developer is assigned to every project, and documents are
+    uploaded by rotating users so relationship lazy loads cannot hide behind
+    the identity map.
+    """
+    def _seed(projects=10, developers_per_project=3, documents_per_project=3):
+        with app.app_context():
+            return _populate(projects, developers_per_project, documents_per_project)
+
+    def _populate(projects, developers_per_project, documents_per_project):
+        def make_user(name, role):
+            return User(username=name, email=f'{name}@pixelforge.test', role=role,
+                        password_hash=SEED_PASSWORD_HASH)
+
+        admin = make_user('admin', 'admin')
+        lead = make_user('lead', 'project_lead')
+        other_leads = [make_user(f'lead{i}', 'project_lead') for i in range(projects)]
+        developers = [make_user(f'dev{i}', 'developer') for i in range(max(developers_per_project, 1))]
+        db.session.add_all([admin, lead] + other_leads + developers)
+        db.session.flush()
+
+        uploaders = [lead] + other_leads + developers
+        deadline = datetime.utcnow() + timedelta(days=30)
+        project_rows = []
+        for i in range(projects):
+            project = Project(name=f'Project {i}', description=f'Seeded project {i}',
+                              deadline=deadline + timedelta(days=i),
+                              lead_id=lead.id if i % 2 == 0 else other_leads[i].id)
+            project.assigned_developers.extend(developers[:developers_per_project])
+            project_rows.append(project)
+        db.session.add_all(project_rows)
+        db.session.flush()
+
+        documents = []
+        for project in project_rows:
+            for j in range(documents_per_project):
+                filename = f'p{project.id}_doc{j}.txt'
+                documents.append(Document(filename=filename,
+                                          filepath=os.path.join(app.config['UPLOAD_FOLDER'], filename),
+                                          project_id=project.id,
+                                          uploaded_by_id=uploaders[j % len(uploaders)].id))
+        db.session.add_all(documents)
+        db.session.commit()
+
+        return SimpleNamespace(admin=admin.id, lead=lead.id, developer=developers[0].id,
+                               projects=[p.id for p in project_rows])
+    return _seed
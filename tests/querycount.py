@@ -0,0 +1,39 @@
+# Helpers for asserting how many SQL statements a request issues.
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryLog:
+    """Statements recorded by record_queries(), in execution order."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def __str__(self):
+        return '\n'.join(f'{i + 1}. {statement}' for i, statement in enumerate(self.statements))
+
+
+@contextmanager
+def record_queries(engine):
+    """
+    Records every SQL statement sent to `engine` inside the block:
+
+        with record_queries(db.engine) as queries:
+            client.get('/index')
+        assert len(queries) <= 3, str(queries)
+    """
+    log = QueryLog()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        log.statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield log
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,204 @@
+# Archival of completed projects into the archive tables (archive.py).
+
+import gzip
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from archive import archive_completed_projects, restore_project, ArchiveError
+from extensions import db
+from models import User, Project, Document, ArchivedProject, ArchivedDocument, archived_assignments
+
+
+def _complete(app, project_ids, days_ago):
+    with app.app_context():
+        for project_id in project_ids:
+            project = db.session.get(Project, project_id)
+            project.is_completed = True
+            project.completed_at = datetime.utcnow() - timedelta(days=days_ago)
+        db.session.commit()
+
+
+def test_archive_moves_only_old_completed_projects(app, seed):
+    data = seed(projects=4, developers_per_project=2, documents_per_project=2)
+    old, recent = data.projects[:2], data.projects[2:3]
+    _complete(app, old, days_ago=200)
+    _complete(app, recent, days_ago=5)
+
+    with app.app_context():
+        assert archive_completed_projects(older_than_days=90) == 2
+        assert Project.query.count() == 2
+        assert Document.query.count() == 4
+        assert sorted(p.original_id for p in ArchivedProject.query) == sorted(old)
+        assert ArchivedDocument.query.count() == 4
+        assert len(db.session.execute(db.select(archived_assignments)).all()) == 4
+        assert archive_completed_projects(older_than_days=90) == 0
+
+
+def test_restore_brings_project_back(app, seed):
+    data = seed(projects=2, developers_per_project=2, documents_per_project=2)
+    project_id = data.projects[0]
+    _complete(app, [project_id], days_ago=200)
+
+    with app.app_context():
+        archive_completed_projects(older_than_days=90)
+        archived_project = ArchivedProject.query.one()
+        project = restore_project(archived_project)
+
+        assert project.id == project_id
+        assert project.is_completed
+        assert project.assigned_developers.count() == 2
+        assert project.documents.count() == 2
+        assert ArchivedProject.query.count() == 0
+        assert ArchivedDocument.query.count() == 0
+
+
+def test_restored_project_is_not_archived_again(app, seed):
+    data = seed(projects=1, developers_per_project=1, documents_per_project=1)
+    _complete(app, data.projects, days_ago=200)
+
+    with app.app_context():
+        assert archive_completed_projects(older_than_days=90) == 1
+        restore_project(ArchivedProject.query.one())
+        assert archive_completed_projects(older_than_days=90) == 0
+        assert Project.query.count() == 1
+
+
+def test_move_blobs_compresses_and_restores_files(app, seed):
+    data = seed(projects=1, developers_per_project=1, documents_per_project=1)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    with app.app_context():
+        document = Document.query.one()
+        filepath = document.filepath
+    with open(filepath, 'wb') as f:
+        f.write(b'design notes ' * 100)
+    _complete(app, data.projects, days_ago=200)
+
+    with app.app_context():
+        archive_completed_projects(older_than_days=90, move_blobs=True)
+        archived_document = ArchivedDocument.query.one()
+        assert not os.path.exists(filepath)
+        with gzip.open(archived_document.archive_path, 'rb') as f:
+            assert f.read() == b'design notes ' * 100
+
+        archive_path = archived_document.archive_path
+        restore_project(ArchivedProject.query.one())
+        assert not os.path.exists(archive_path)
+        with open(Document.query.one().filepath, 'rb') as f:
+            assert f.read() == b'design notes ' * 100
+    os.remove(filepath)
+
+
+def test_blobs_are_compressed_before_the_write_transaction(app, seed, monkeypatch):
+    import archive
+
+    data = seed(projects=1, developers_per_project=1, documents_per_project=1)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    with app.app_context():
+        filepath = Document.query.one().filepath
+    with open(filepath, 'wb') as f:
+        f.write(b'texture')
+    _complete(app, data.projects, days_ago=200)
+
+    compress = archive._compress
+    def checked_compress(source, destination):
+        # Nothing has been added to the session yet, so no write lock is held
+        assert not db.session.new
+        compress(source, destination)
+    monkeypatch.setattr(archive, '_compress', checked_compress)
+
+    with app.app_context():
+        assert archive_completed_projects(older_than_days=90, move_blobs=True) == 1
+        archive_path = ArchivedDocument.query.one().archive_path
+    assert os.path.exists(archive_path)
+    os.remove(archive_path)
+
+
+def test_archive_views_respect_roles(app, client, login, seed):
+    data = seed(projects=2, developers_per_project=1, documents_per_project=1)
+    _complete(app, data.projects, days_ago=200)
+    with app.app_context():
+        archive_completed_projects(older_than_days=90)
+        led_by_other = ArchivedProject.query.filter(ArchivedProject.lead_id != data.lead).first().id
+
+    login(data.lead)
+    response = client.get(f'/archive/{led_by_other}')
+    assert response.status_code == 302
+    assert client.post(f'/archive/{led_by_other}/restore').status_code == 302
+    with app.app_context():
+        assert ArchivedProject.query.count() == 2
+
+    login(data.admin)
+    assert client.get(f'/archive/{led_by_other}').status_code == 200
+    client.post(f'/archive/{led_by_other}/restore')
+    with app.app_context():
+        assert ArchivedProject.query.count() == 1
+
+
+def test_deleted_user_is_removed_from_the_archive(app, client, login, seed):
+    data = seed(projects=1, developers_per_project=1, documents_per_project=1)
+    _complete(app, data.projects, days_ago=200)
+    with app.app_context():
+        archive_completed_projects(older_than_days=90)
+
+    login(data.admin)
+    for user_id in (data.lead, data.developer):
+        assert client.post(f'/user/{user_id}/delete').status_code == 302
+
+    with app.app_context():
+        archived_project = ArchivedProject.query.one()
+        assert archived_project.lead_id is None
+        assert archived_project.lead_username == 'lead'
+        assert db.session.execute(db.select(archived_assignments)).all() == []
+        assert ArchivedDocument.query.one().uploaded_by_id is None
+
+
+def _archive_with_blob(app, seed):
+    data = seed(projects=1, developers_per_project=1, documents_per_project=1)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    with app.app_context():
+        filepath = Document.query.one().filepath
+    with open(filepath, 'wb') as f:
+        f.write(b'level layout')
+    _complete(app, data.projects, days_ago=200)
+    with app.app_context():
+        archive_completed_projects(older_than_days=90, move_blobs=True)
+        archived_project = ArchivedProject.query.one()
+        return data, archived_project.id, ArchivedDocument.query.one().archive_path
+
+
+@pytest.mark.parametrize('damage', ['missing', 'corrupt'])
+def test_restore_with_damaged_blob_reports_error(app, client, login, seed, damage):
+    data, archived_id, archive_path = _archive_with_blob(app, seed)
+    if damage == 'missing':
+        os.remove(archive_path)
+    else:
+        with open(archive_path, 'wb') as f:
+            f.write(b'not gzip data')
+
+    login(data.admin)
+    response = client.post(f'/archive/{archived_id}/restore', follow_redirects=True)
+    assert response.status_code == 200
+    assert b'Could not restore project' in response.data
+    with app.app_context():
+        assert ArchivedProject.query.count() == 1
+        assert Project.query.count() == 0
+    if damage == 'corrupt':
+        os.remove(archive_path)
+
+
+def test_restore_without_fallback_uploader_is_refused(app, seed):
+    data = seed(projects=1, developers_per_project=1, documents_per_project=1)
+    _complete(app, data.projects, days_ago=200)
+    with app.app_context():
+        archive_completed_projects(older_than_days=90)
+        # The uploader (the lead) and the only admin are gone
+        User.query.filter(User.id.in_([data.lead, data.admin])).delete(synchronize_session=False)
+        db.session.commit()
+
+        with pytest.raises(ArchiveError):
+            restore_project(ArchivedProject.query.one())
+        assert ArchivedProject.query.count() == 1
+        assert Project.query.count() == 0
+
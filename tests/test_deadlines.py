@@ -0,0 +1,79 @@
+# Deadline digest job (deadlines.py).
+
+import mailbox
+from datetime import datetime, timedelta
+
+from deadlines import collect_digests, write_outbox
+from extensions import db
+from models import Project, project_assignments
+from querycount import record_queries
+
+
+def _set_deadlines(app, project_ids, now, days):
+    with app.app_context():
+        for project_id, offset in zip(project_ids, days):
+            db.session.get(Project, project_id).deadline = now + timedelta(days=offset)
+        db.session.commit()
+
+
+def test_digests_group_projects_per_lead_and_developer(app, seed):
+    data = seed(projects=4, developers_per_project=2, documents_per_project=0)
+    now = datetime.utcnow()
+    # Projects 0 and 2 are led by data.lead; 3 is overdue and left out
+    _set_deadlines(app, data.projects, now, [0.5, 5, 20, -1])
+    # data.lead is also assigned to project 0, which must not be listed twice
+    with app.app_context():
+        db.session.execute(project_assignments.insert().values(project_id=data.projects[0], user_id=data.lead))
+        db.session.commit()
+
+    with app.app_context():
+        project_count, digests = collect_digests(windows=(1, 7, 30), now=now)
+
+    assert project_count == 3
+    assert [(window, role) for window, role, _, _ in digests[data.lead].items] == [(1, 'lead'), (30, 'lead')]
+    assert [window for window, _, _, _ in digests[data.developer].items] == [1, 7, 30]
+
+
+def test_completed_projects_are_skipped(app, seed):
+    data = seed(projects=2, developers_per_project=1, documents_per_project=0)
+    now = datetime.utcnow()
+    _set_deadlines(app, data.projects, now, [2, 3])
+    with app.app_context():
+        db.session.get(Project, data.projects[0]).is_completed = True
+        db.session.commit()
+        project_count, _ = collect_digests(windows=(7,), now=now)
+    assert project_count == 1
+
+
+def test_collect_digests_issues_a_single_query(app, seed, scale):
+    seed(projects=scale, developers_per_project=scale, documents_per_project=0)
+    with app.app_context():
+        with record_queries(db.engine) as queries:
+            project_count, _ = collect_digests(windows=(365,))
+    assert project_count == scale
+    assert len(queries) == 1, str(queries)
+
+
+def test_outbox_is_written_in_batches(app, seed, tmp_path):
+    data = seed(projects=3, developers_per_project=3, documents_per_project=0)
+    now = datetime.utcnow()
+    _set_deadlines(app, data.projects, now, [1, 2, 3])
+    with app.app_context():
+        _, digests = collect_digests(windows=(7,), now=now)
+        paths = write_outbox(digests.values(), outbox=str(tmp_path), batch_size=2, now=now)
+
+    # data.lead (projects 0 and 2), lead1 and three developers
+    assert len(digests) == 5
+    assert len(paths) == 3
+    messages = [message for path in paths for message in mailbox.mbox(path)]
+    assert sorted(message['To'] for message in messages) == \
+        sorted(f'{name}@pixelforge.test' for name in ['lead', 'lead1', 'dev0', 'dev1', 'dev2'])
+
+
+def test_cli_digest_command(app, seed, tmp_path):
+    data = seed(projects=1, developers_per_project=1, documents_per_project=0)
+    _set_deadlines(app, data.projects, datetime.utcnow(), [3])
+    result = app.test_cli_runner().invoke(args=['deadlines', 'digest', '--window', '7', '--outbox', str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert '1 project(s) due, 2 digest(s)' in result.output
+    assert len(list(tmp_path.glob('*.mbox'))) == 1
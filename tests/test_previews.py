@@ -0,0 +1,170 @@
+# Document previews (previews.py and the document_preview route).
+
+import os
+import time
+from types import SimpleNamespace
+
+import previews
+from extensions import db, preview_service
+from models import Document
+from previews import PreviewService, READY, PENDING, UNSUPPORTED
+
+
+def _wait_for(lookup, timeout=5):
+    """Polls `lookup` until it stops returning PENDING."""
+    deadline = time.monotonic() + timeout
+    while True:
+        status, path = lookup()
+        if status != PENDING or time.monotonic() > deadline:
+            return status, path
+        time.sleep(0.02)
+
+
+def _add_document(app, seed, path):
+    data = seed(projects=1, developers_per_project=1, documents_per_project=0)
+    with app.app_context():
+        document = Document(filename=os.path.basename(path), filepath=str(path),
+                            project_id=data.projects[0], uploaded_by_id=data.lead)
+        db.session.add(document)
+        db.session.commit()
+        return data, document.id
+
+
+def _service(tmp_path, **config):
+    service = PreviewService()
+    service.init_app(SimpleNamespace(config=dict({
+        'PREVIEW_FOLDER': str(tmp_path / 'previews'),
+        'PREVIEW_CACHE_BYTES': 1024 * 1024,
+        'PREVIEW_SIZES': (128,),
+        'PREVIEW_WORKERS': 1,
+        'PREVIEW_RETRY_AFTER': 60,
+        'PREVIEW_DIGEST_CACHE_SIZE': 100,
+    }, **config)))
+    return service
+
+
+def test_preview_is_pending_then_served(app, client, login, seed, tmp_path):
+    path = tmp_path / 'notes.md'
+    path.write_text('# Level design\nBoss arena layout\n')
+    data, document_id = _add_document(app, seed, path)
+    login(data.admin)
+    assert b'data-pending' in client.get(f'/project/{data.projects[0]}').data
+
+    response = client.get(f'/document/{document_id}/preview')
+    assert response.status_code == 202
+    assert response.headers['Cache-Control'] == 'no-store'
+
+    deadline = time.monotonic() + 5
+    while response.status_code == 202 and time.monotonic() < deadline:
+        time.sleep(0.02)
+        response = client.get(f'/document/{document_id}/preview')
+    assert response.status_code == 200
+    assert b'Boss arena layout' in response.data
+    # Cached previews are not marked for polling
+    assert b'data-pending' not in client.get(f'/project/{data.projects[0]}').data
+
+
+def test_unsupported_type_gets_file_icon(app, client, login, seed, tmp_path):
+    path = tmp_path / 'model.fbx'
+    path.write_bytes(b'\x00' * 64)
+    data, document_id = _add_document(app, seed, path)
+    login(data.admin)
+
+    assert b'data-pending' not in client.get(f'/project/{data.projects[0]}').data
+    response = client.get(f'/document/{document_id}/preview')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/svg+xml'
+    assert b'FBX' in response.data
+
+
+def test_unknown_size_is_rejected(app, client, login, seed, tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('hello')
+    data, document_id = _add_document(app, seed, path)
+    login(data.admin)
+    assert client.get(f'/document/{document_id}/preview?size=7').status_code == 400
+
+
+def test_evicted_preview_falls_back_to_placeholder(app, client, login, seed, tmp_path, monkeypatch):
+    path = tmp_path / 'notes.txt'
+    path.write_text('hello')
+    data, document_id = _add_document(app, seed, path)
+    login(data.admin)
+
+    lookups = []
+    def lookup(filepath, size):
+        lookups.append(filepath)
+        return (READY, str(tmp_path / 'evicted.svg')) if len(lookups) == 1 else (PENDING, None)
+    monkeypatch.setattr(preview_service, 'lookup', lookup)
+
+    response = client.get(f'/document/{document_id}/preview')
+    assert response.status_code == 202
+    assert len(lookups) == 2 # Re-queued
+
+
+def test_least_recently_used_previews_are_evicted(tmp_path):
+    files = []
+    for name in ('a', 'b', 'c'):
+        path = tmp_path / f'{name}.txt'
+        path.write_text(f'{name} ' * 50)
+        files.append(str(path))
+
+    service = _service(tmp_path)
+    status, first = _wait_for(lambda: service.lookup(files[0], 128))
+    assert status == READY
+    # Budget for two previews of this size
+    service.max_bytes = os.path.getsize(first) * 2 + 10
+
+    _wait_for(lambda: service.lookup(files[1], 128))
+    os.utime(first, (time.time() + 10, time.time() + 10)) # files[0] was used most recently
+    _wait_for(lambda: service.lookup(files[2], 128))
+
+    remaining = [name for name in os.listdir(tmp_path / 'previews') if name != previews.INDEX_FILENAME]
+    assert len(remaining) == 2
+    assert os.path.basename(first) in remaining
+
+
+def test_failed_preview_is_retried_after_delay(tmp_path, monkeypatch):
+    path = tmp_path / 'notes.txt'
+    path.write_text('hello')
+    service = _service(tmp_path, PREVIEW_RETRY_AFTER=0.2)
+
+    read_snippet = previews._read_text_snippet
+    calls = []
+    def flaky_read(filepath):
+        calls.append(filepath)
+        if len(calls) == 1:
+            raise OSError('file still being written')
+        return read_snippet(filepath)
+    monkeypatch.setattr(previews, '_read_text_snippet', flaky_read)
+
+    assert _wait_for(lambda: service.lookup(str(path), 128))[0] == UNSUPPORTED
+    time.sleep(0.25)
+    assert _wait_for(lambda: service.lookup(str(path), 128))[0] == READY
+
+
+def test_cached_preview_is_found_after_restart_without_rehashing(tmp_path, monkeypatch):
+    path = tmp_path / 'notes.txt'
+    path.write_text('hello')
+    status, cached = _wait_for(lambda: _service(tmp_path).lookup(str(path), 128))
+    assert status == READY
+
+    def no_hashing(filepath):
+        raise AssertionError('original was read again')
+    monkeypatch.setattr(previews, '_hash_file', no_hashing)
+
+    restarted = _service(tmp_path)
+    assert restarted.is_ready(str(path), 128)
+    assert restarted.lookup(str(path), 128) == (READY, cached)
+
+
+def test_in_memory_digest_cache_is_bounded(tmp_path):
+    service = _service(tmp_path, PREVIEW_DIGEST_CACHE_SIZE=2)
+    for name in ('a', 'b', 'c'):
+        path = tmp_path / f'{name}.txt'
+        path.write_text(name)
+        assert _wait_for(lambda: service.lookup(str(path), 128))[0] == READY
+    assert len(service._digests) == 2
+    # Evicted from memory but still served from the on-disk index
+    assert service.is_ready(str(tmp_path / 'a.txt'), 128)
+
@@ -0,0 +1,57 @@
+# Per-route SQL query budgets.
+#
+# Each entry caps how many statements one GET may issue for a given role, at every
+# seeded scale (see --seed-scales). A lazy load inside a loop makes the count grow
+# with the data and fails here long before it is noticed in production.
+
+import pytest
+from flask import url_for
+
+from extensions import db
+from querycount import record_queries
+
+# (endpoint, role, max queries, url arguments from the seeded data)
+QUERY_BUDGETS = [
+    ('index', 'admin', 3, lambda data: {}),
+    ('index', 'lead', 3, lambda data: {}),
+    ('index', 'developer', 3, lambda data: {}),
+    ('project_details', 'admin', 5, lambda data: {'project_id': data.projects[0]}),
+    ('project_details', 'lead', 5, lambda data: {'project_id': data.projects[0]}),
+    ('project_details', 'developer', 5, lambda data: {'project_id': data.projects[0]}),
+    ('users', 'admin', 3, lambda data: {}),
+    ('archive', 'admin', 3, lambda data: {}),
+    ('archive', 'developer', 3, lambda data: {}),
+]
+
+
+def _count_queries(app, client, login, data, endpoint, role, url_args):
+    login(getattr(data, role))
+    with app.test_request_context():
+        url = url_for(endpoint, **url_args(data))
+        engine = db.engine
+    with record_queries(engine) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, f'{endpoint} as {role} returned {response.status_code}'
+    return queries
+
+
+@pytest.mark.parametrize('endpoint, role, budget, url_args', QUERY_BUDGETS,
+                         ids=[f'{endpoint}-{role}' for endpoint, role, _, _ in QUERY_BUDGETS])
+def test_query_budget(app, client, login, seed, scale, endpoint, role, budget, url_args):
+    data = seed(projects=scale, developers_per_project=scale, documents_per_project=scale)
+    queries = _count_queries(app, client, login, data, endpoint, role, url_args)
+    assert len(queries) <= budget, \
+        f'{endpoint} as {role} issued {len(queries)} queries (budget {budget}):\n{queries}'
+
+
+@pytest.mark.parametrize('endpoint, role, budget, url_args', QUERY_BUDGETS,
+                         ids=[f'{endpoint}-{role}' for endpoint, role, _, _ in QUERY_BUDGETS])
+def test_query_count_independent_of_data_size(app, client, login, seed, endpoint, role, budget, url_args):
+    counts = []
+    for scale in (2, 20):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        data = seed(projects=scale, developers_per_project=scale, documents_per_project=scale)
+        counts.append(len(_count_queries(app, client, login, data, endpoint, role, url_args)))
+    assert counts[0] == counts[1], f'{endpoint} as {role}: query count grew from {counts[0]} to {counts[1]}'